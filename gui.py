@@ -8,11 +8,13 @@ gui.py – Pixel-Paper frame GUI & BLE provisioning (Optimized)
 • Handles complex BLE commands for all features.
 """
 
-import os, queue, socket, subprocess, threading, time, tkinter as tk, json, sys
+import functools, os, queue, random, re, selectors, socket, subprocess, threading, time, tkinter as tk, json, sys
+import tkinter.font as tkfont
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from itertools import count
 from bluezero import adapter, peripheral
 import ttkbootstrap as tb
-from ttkbootstrap.toast import ToastNotification
 from ttkbootstrap import ttk
 from PIL import Image, ImageTk, ImageSequence
 from datetime import datetime
@@ -44,8 +46,12 @@ PROVISIONING_CHAR_UUID    = "12345678-1234-5678-1234-56789abcdef1"
 SERIAL_CHAR_UUID          = "12345678-1234-5678-1234-56789abcdef2"
 SETTINGS_CHAR_UUID       = "12345678-1234-5678-1234-56789abcdef3"  # NEW: settings
 
-toast_queue = queue.SimpleQueue()
+worker_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='pxpaper')
+# Bounded: if messages arrive faster than the GUI drains them, old entries
+# are dropped instead of the backlog growing without limit.
+toast_queue = deque(maxlen=50)
 wifi_status_queue = queue.SimpleQueue()
+wifi_wake = threading.Event()   # set to trigger an immediate Wi-Fi re-check
 auto_brightness_enabled = False
 last_set_brightness = -1
 settings_cache = {}  # NEW: in-memory settings
@@ -82,22 +88,200 @@ def apply_startup_settings():
         set_manual_brightness(s['brightness'], silent=True)
 
 # ─────────────────────────── Optimized Toast ─────────────────────────────
+TOAST_BG       = "#1b1b1b"
+TOAST_FG       = {"info": GREEN, "success": GREEN,
+                  "warning": "#f0ad4e", "danger": "#d9534f"}
+TOAST_WIDTH    = 360
+TOAST_MARGIN   = 10
+TOAST_SPACING  = 8
+TOAST_SHOW_MS    = 3000
+TOAST_POOL_MAX   = 6
+TOAST_MAX_ACTIVE = 5   # oldest toast is evicted beyond this
+TOAST_FADE_STEPS  = 12
+TOAST_SLIDE_STEPS = 10
+TOAST_TICK_MS     = 50   # one shared 20 Hz ticker drives slide, life and fade
+
+def _slide_keyframes(start, end):
+    """Precomputes the eased (cubic-out) integer positions for a slide-in,
+    dropping consecutive duplicates so the ticker just indexes the list."""
+    xs = []
+    for i in range(TOAST_SLIDE_STEPS + 1):
+        p = i / TOAST_SLIDE_STEPS
+        x = int(start + (end - start) * (1 - (1 - p) ** 3))
+        if not xs or x != xs[-1]:
+            xs.append(x)
+    return xs
+
+# sRGB <-> linear-light tables, built once. Blending through these gives a
+# perceptually even fade ramp; lerping raw sRGB bytes darkens the midtones.
+_SRGB2LIN = [(c / 12.92) if (c := v / 255) <= 0.04045
+             else ((c + 0.055) / 1.055) ** 2.4 for v in range(256)]
+
+def _lin2srgb(c):
+    c = 12.92 * c if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+    return min(255, max(0, round(c * 255)))
+
+def _blend(c1, c2, t):
+    """Blend between two #rrggbb colors, t in [0, 1], interpolating in
+    linear-light space via the precomputed sRGB tables. Only runs at import
+    to build the fade LUT, so the float math never hits the ticker."""
+    a, b = bytes.fromhex(c1[1:]), bytes.fromhex(c2[1:])
+    return '#%02x%02x%02x' % tuple(
+        _lin2srgb(_SRGB2LIN[a[i]] + (_SRGB2LIN[b[i]] - _SRGB2LIN[a[i]]) * t)
+        for i in range(3))
+
+# Fade colors only ever hit TOAST_FADE_STEPS discrete points per style, so
+# precompute every (bg, fg) pair at import and keep _blend out of the ticker.
+_FADE_LUT = {
+    style: [(_blend(TOAST_BG, "#000000", i / TOAST_FADE_STEPS),
+             _blend(fg, "#000000", i / TOAST_FADE_STEPS))
+            for i in range(TOAST_FADE_STEPS + 1)]
+    for style, fg in TOAST_FG.items()
+}
+
+class Toast:
+    """A toast message drawn on a pooled Label.
+
+    ToastNotification builds a fresh Toplevel per message — a full window-
+    manager round trip every time, which floods the event queue during BLE
+    log storms. These reuse plain Labels placed over the root window and
+    hand them back to a small pool when dismissed.
+    """
+    # Insertion-ordered dict keyed by id(): O(1) removal, ordered iteration.
+    active = {}
+    _pool  = []
+
+    def __init__(self, msg, style="info"):
+        # Bound the stack during error storms: evict the oldest toast rather
+        # than letting reflow work grow with an unbounded pile.
+        while len(Toast.active) >= TOAST_MAX_ACTIVE:
+            next(iter(Toast.active.values())).dismiss()
+        if Toast._pool:
+            self.label = Toast._pool.pop()
+        else:
+            self.label = tk.Label(root, justify="left", anchor="w", font=TOAST_FONT,
+                                  wraplength=TOAST_WIDTH - 24, padx=12, pady=10,
+                                  bd=0, highlightthickness=0)
+        self.label.config(text=msg, bg=TOAST_BG, fg=TOAST_FG.get(style, GREEN))
+        self.msg = msg
+        self.repeats = 1
+        self.style = style
+        self.born = time.monotonic()
+        self.fade_step = None
+        # Slide in from just past the right screen edge: the whole eased
+        # trajectory is precomputed as integers, no per-frame float math.
+        screen_w = root.winfo_screenwidth()
+        self.slide_xs = _slide_keyframes(screen_w, screen_w - TOAST_WIDTH - TOAST_MARGIN)
+        self.slide_i = 0
+        self.x = self.slide_xs[0]
+        self.y = TOAST_MARGIN
+        self._last_x = self._last_y = None  # last coords actually sent to Tk
+        self._height = None                 # measured lazily, then cached
+        Toast.active[id(self)] = self
+        Toast.reflow()
+        Toast._start_ticker()
+
+    def height(self):
+        # winfo_reqheight is a Tcl round-trip; the text never changes after
+        # creation (dedup only appends a suffix late in life), so measure once.
+        if self._height is None:
+            self._height = self.label.winfo_reqheight()
+        return self._height
+
+    def _place_if_moved(self):
+        """Issues a place() only when the integer position changed, keeping
+        Tcl round-trips out of frames where nothing moved."""
+        nx, ny = int(self.x), int(self.y)
+        if nx != self._last_x or ny != self._last_y:
+            self.label.place(x=nx, y=ny, width=TOAST_WIDTH)
+            self._last_x, self._last_y = nx, ny
+
+    @classmethod
+    def reflow(cls):
+        y = TOAST_MARGIN
+        for t in cls.active.values():
+            t.y = y
+            t._place_if_moved()
+            y += t.height() + TOAST_SPACING
+
+    _ticker_running = False
+
+    @classmethod
+    def _start_ticker(cls):
+        if not cls._ticker_running:
+            cls._ticker_running = True
+            root.after(TOAST_TICK_MS, cls._tick)
+
+    @classmethod
+    def _tick(cls):
+        """The single animation driver: one Tk timer steps every active
+        toast's slide, lifetime and fade instead of a timer chain each."""
+        now = time.monotonic()
+        changed = False
+        for t in list(cls.active.values()):
+            if t.fade_step is None:
+                if t.slide_i < len(t.slide_xs):
+                    t.x = t.slide_xs[t.slide_i]
+                    t.slide_i += 1
+                    t._place_if_moved()
+                    changed = True
+                if (now - t.born) * 1000 >= TOAST_SHOW_MS:
+                    t.fade_step = 0
+            else:
+                t.fade_step += 1
+                if t.fade_step >= TOAST_FADE_STEPS:
+                    t.dismiss()
+                else:
+                    bg, fg = _FADE_LUT.get(t.style, _FADE_LUT["info"])[t.fade_step]
+                    t.label.config(bg=bg, fg=fg)
+                changed = True
+        if changed:
+            # One redraw for the whole batch rather than one per label update.
+            root.update_idletasks()
+        if cls.active:
+            root.after(TOAST_TICK_MS, cls._tick)
+        else:
+            cls._ticker_running = False
+
+    def dismiss(self):
+        Toast.active.pop(id(self), None)
+        self.label.place_forget()
+        if len(Toast._pool) < TOAST_POOL_MAX:
+            Toast._pool.append(self.label)
+        else:
+            self.label.destroy()
+        Toast.reflow()
+
+_STYLE_SEVERITY = {"info": 0, "success": 1, "warning": 2, "danger": 3}
+
 def show_toast_from_queue():
-    """Processes one toast message from the queue."""
+    """Drains queued messages once per tick. A repeat of the newest visible
+    toast becomes an (xN) suffix; several distinct messages arriving in the
+    same tick are merged into one multi-line toast instead of a widget each."""
     try:
-        if not toast_queue.empty():
-            msg, style = toast_queue.get_nowait()
-            toast = ToastNotification(
-                title="Pixel Paper", message=msg, duration=3000,
-                bootstyle=style, position=(10, 10, 'ne'), alpha=0.9
-            )
-            toast.show_toast()
+        batch, style = [], "info"
+        while toast_queue and len(batch) < 3:
+            msg, msg_style = toast_queue.popleft()
+            last = next(reversed(Toast.active.values())) if Toast.active else None
+            if not batch and last is not None and last.msg == msg and last.fade_step is None:
+                last.repeats += 1
+                last.born = time.monotonic()
+                last.label.config(text=f"{msg} (x{last.repeats})")
+                continue
+            batch.append(msg)
+            # The merged toast carries the most severe style in the batch.
+            if _STYLE_SEVERITY.get(msg_style, 0) > _STYLE_SEVERITY.get(style, 0):
+                style = msg_style
+        if batch:
+            Toast("\n".join(batch), style)
+    except IndexError:
+        pass
     finally:
         root.after(100, show_toast_from_queue)
 
 def log_message(msg: str, style="info"):
     """Public function to queue a toast message."""
-    toast_queue.put((msg, style))
+    toast_queue.append((msg, style))
     print(msg, flush=True)
 
 # ─────────────────── Optimized Spinner with Pillow ─────────────────────
@@ -132,48 +316,173 @@ def hide_spinner():
     spinner_label.pack_forget()
     spinner_running = False
 
+def _ui(fn, *args):
+    """Marshals a widget update from a worker thread onto the Tk loop; the
+    handlers running on worker_pool must never touch widgets directly."""
+    root.after(0, fn, *args)
+
 # ───────────────────────── Utility helpers ─────────────────────────────
+adapter_address_cache = None
+
+def get_adapter_address():
+    """Returns the BD address of hci0, preferring a cheap sysfs read over a
+    bluezero adapter scan. The result is cached for the process lifetime."""
+    global adapter_address_cache
+    if adapter_address_cache:
+        return adapter_address_cache
+    try:
+        with open('/sys/class/bluetooth/hci0/address') as f:
+            adapter_address_cache = f.read().strip().upper()
+    except OSError:
+        dongles = adapter.Adapter.available()
+        if dongles:
+            adapter_address_cache = list(dongles)[0].address
+    return adapter_address_cache
+
+@functools.lru_cache(maxsize=1)
 def get_serial_number():
+    """The serial is immutable for the life of the device, so read
+    /proc/device-tree/serial-number once and cache it."""
     try:
-        with open('/proc/device-tree/serial-number') as f:
-            return "PX" + f.read().strip('\x00\n ')
-    except Exception:
+        fd = os.open('/proc/device-tree/serial-number', os.O_RDONLY)
+        try:
+            raw = os.read(fd, 64)
+        finally:
+            os.close(fd)
+        return "PX" + raw.decode('ascii').strip('\x00\n ')
+    except (OSError, UnicodeDecodeError):
         return "PXunknown"
 
 def disable_pairing():
-    subprocess.run(["bluetoothctl"], input="pairable no\nquit\n", text=True, capture_output=True)
+    """Clears the adapter's Pairable flag over D-Bus via bluezero, instead of
+    forking an interactive bluetoothctl session just to type 'pairable no'."""
+    try:
+        dongle = adapter.Adapter(get_adapter_address())
+        dongle.pairable = False
+    except Exception:
+        # Adapter not up yet (or no sysfs entry) — fall back to the shell.
+        subprocess.run(["bluetoothctl"], input="pairable no\nquit\n", text=True, capture_output=True)
 
 def clear_wifi_profiles():
     try:
         out = subprocess.check_output(["nmcli", "-t", "-f", "UUID,TYPE", "c"], text=True)
-        for ln in out.splitlines():
-            uuid, ctype = ln.split(':', 1)
-            if ctype == "802-11-wireless":
-                subprocess.run(["sudo", "nmcli", "c", "delete", uuid], check=False, capture_output=True)
+        uuids = [ln.split(':', 1)[0] for ln in out.splitlines()
+                 if ln.split(':', 1)[1] == "802-11-wireless"]
+        if uuids:
+            # nmcli takes multiple UUIDs, so delete them all in one fork.
+            subprocess.run(["sudo", "nmcli", "c", "delete", *uuids], check=False, capture_output=True)
         subprocess.run(["sudo", "nmcli", "c", "reload"], check=False)
     except Exception as exc:
         log_message(f"Wi-Fi Clear Error: {exc}", "warning")
 
 # ── Non-Blocking Wi-Fi & Chromium Management ─────────────────────────────
+def wlan_link_up(interface="wlan0"):
+    """Cheap local check: is the Wi-Fi link itself up? Reads the interface's
+    sysfs operstate. A missing interface reads as down."""
+    try:
+        with open(f'/sys/class/net/{interface}/operstate') as f:
+            return f.read().strip() == 'up'
+    except OSError:
+        return False
+
+def has_default_route():
+    """Cheap local check: is there a default gateway with the RTF_UP flag?
+    Reads /proc/net/route instead of touching the network."""
+    try:
+        with open('/proc/net/route') as f:
+            for line in f.readlines()[1:]:
+                fields = line.split()
+                if len(fields) > 3 and fields[1] == '00000000' and int(fields[3], 16) & 2:
+                    return True
+    except (OSError, ValueError):
+        pass
+    return False
+
+# Minimal DNS query (NS for the root zone): header + 1 question, 17 bytes.
+_DNS_PROBE = (b'\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00'
+              b'\x00\x00\x02\x00\x01')
+
+def probe_internet(timeout=3.0):
+    """Reachability probe of a public DNS resolver: one UDP query datagram
+    and wait for any reply. One packet each way — no TCP handshake and no
+    TIME_WAIT socket left behind every poll cycle."""
+    sel = selectors.DefaultSelector()
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.setblocking(False)
+    try:
+        s.connect(("8.8.8.8", 53))
+        s.send(_DNS_PROBE)
+        sel.register(s, selectors.EVENT_READ)
+        if not sel.select(timeout=timeout):
+            return False
+        s.recv(512)
+        return True
+    except OSError:
+        return False
+    finally:
+        sel.close()
+        s.close()
+
 def wifi_check_worker():
-    """Continuously checks Wi-Fi status in a background thread."""
+    """Continuously checks Wi-Fi status in a background thread.
+
+    The cheap local checks (link operstate + default route) run every loop;
+    the network probe
+    only fires on link-state transitions, on an explicit wake, or as a
+    once-a-minute deep check, so a stable connection costs no traffic."""
+    last_route = None
+    last_probe_ok = False
+    deep_check_due = 0.0
+    force_probe = True
+    while True:
+        route = wlan_link_up() and has_default_route()
+        now = time.monotonic()
+        if not route:
+            ok = False
+        elif force_probe or route != last_route or now >= deep_check_due:
+            ok = probe_internet(timeout=5.0)
+            deep_check_due = now + 60
+        else:
+            ok = last_probe_ok
+        last_probe_ok = ok
+        last_route = route
+        wifi_status_queue.put(ok)
+        # Sleep up to 5 s, but wake immediately when provisioning finishes so
+        # Chromium launches without waiting out the poll interval.
+        force_probe = wifi_wake.wait(timeout=5)
+        wifi_wake.clear()
+
+page_health_cache    = (0.0, True)  # (monotonic timestamp, last result)
+PAGE_HEALTH_INTERVAL = 5            # seconds between real xdotool probes
+page_health_probing  = False        # a worker probe is in flight
+
+def nm_monitor_worker():
+    """Tails one persistent 'nmcli monitor' stream and wakes the Wi-Fi worker
+    on every event, so link changes are noticed immediately instead of on the
+    next poll. Exits quietly when nmcli is unavailable."""
     while True:
         try:
-            s = socket.create_connection(("8.8.8.8", 53), timeout=5)
-            s.close()
-            wifi_status_queue.put(True)
-        except OSError:
-            wifi_status_queue.put(False)
+            proc = subprocess.Popen(["nmcli", "monitor"], stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, text=True)
+        except (FileNotFoundError, OSError):
+            return
+        try:
+            for _line in proc.stdout:
+                wifi_wake.set()
+        finally:
+            proc.stdout.close()
+            proc.wait()
+        # The monitor died (NetworkManager restart?) — reattach shortly.
         time.sleep(5)
 
-def check_chromium_page_health():
+def _probe_page_health():
     """
-    Checks if the active Chromium window's title indicates a crash.
-    Returns True if healthy, False if crashed ("Aw, Snap!").
+    Checks if the active Chromium window's title indicates a crash and
+    refreshes page_health_cache. Runs on the worker pool — the two xdotool
+    forks can each block up to a second, which would stall the Tk loop.
     Requires 'xdotool' to be installed (sudo apt-get install xdotool).
     """
-    if chromium_process is None or chromium_process.poll() is not None:
-        return True # Not running, so not crashed in this context. The main loop will handle restart.
+    global page_health_cache, page_health_probing
     try:
         # Get the ID of the active window
         active_window_cmd = ["xdotool", "getactivewindow"]
@@ -187,17 +496,88 @@ def check_chromium_page_health():
         crashed_titles = ["aw, snap!", "untitled"]
         if any(title in window_title for title in crashed_titles):
             log_message(f"Detected 'Aw, Snap!' error. Window title: {window_title}", "warning")
-            return False
-        return True
+            page_health_cache = (time.monotonic(), False)
+        else:
+            page_health_cache = (time.monotonic(), True)
     except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired) as e:
         # If xdotool fails, assume it's okay to avoid false positives.
         # Log the error so the user knows if xdotool is missing.
         print(f"Could not check window title (is xdotool installed?): {e}", flush=True)
-        return True
+        page_health_cache = (time.monotonic(), True)
+    finally:
+        page_health_probing = False
+
+def check_chromium_page_health():
+    """Returns the last known page health (True = healthy) and, when the
+    cached answer is stale, kicks an async probe on the worker pool. Never
+    forks on the Tk thread; a crashed page is noticed one interval late."""
+    global page_health_probing
+    if chromium_process is None or chromium_process.poll() is not None:
+        return True # Not running, so not crashed in this context. The main loop will handle restart.
+    checked_at, was_healthy = page_health_cache
+    if time.monotonic() - checked_at >= PAGE_HEALTH_INTERVAL \
+            and not page_health_probing:
+        page_health_probing = True
+        worker_pool.submit(_probe_page_health)
+    return was_healthy
+
+chromium_restarting = False
+# monotonic() is uptime on Linux: start at -inf, not 0.0, or the cooldown
+# would block the first launch whenever the GUI starts within 30 s of boot.
+chromium_launch_ts  = float("-inf")
+
+def restart_chromium():
+    """Kills any stale Chromium and launches a fresh kiosk instance. Runs on
+    the worker pool so the Tk loop never blocks on the fork/exec pair."""
+    global chromium_process, chromium_restarting, chromium_launch_ts
+    try:
+        if chromium_process is not None and chromium_process.poll() is None:
+            # We own a live handle — terminate it directly instead of forking
+            # a pkill that walks all of /proc.
+            chromium_process.terminate()
+            try:
+                chromium_process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                chromium_process.kill()
+        elif chromium_process is None:
+            # No handle to reap (first launch after a GUI restart): sweep for
+            # strays from a previous process.
+            subprocess.run(["pkill", "-f", "chromium"], check=False)
+        # A tracked-but-dead process needs neither: it is already gone.
+
+        url = f"https://pixelpaper.com/frame.html?id={get_serial_number()}"
+
+        chromium_flags = [
+            "chromium",
+            "--kiosk",
+            "--no-sandbox",
+            "--disable-extensions",
+            # Keep the profile on tmpfs: respawns skip the SD card entirely
+            # and warm-start from the previous instance's cache.
+            "--user-data-dir=/dev/shm/pxchrome",
+            "--no-first-run",
+            "--disable-component-update",
+            "--autoplay-policy=no-user-gesture-required",
+            url
+        ]
+        # start_new_session detaches Chromium from us, so a GUI crash never
+        # leaves it reparented as an unreapable child of PID 1's session.
+        chromium_process = subprocess.Popen(
+            chromium_flags, start_new_session=True, close_fds=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        # This runs on the worker pool, whose Futures nobody inspects — log
+        # here or a failed launch (missing binary, ENOMEM) vanishes silently.
+        log_message(f"Chromium restart failed: {e}", "danger")
+    finally:
+        # Stamp failures too, so the watchdog's cooldown applies to a launch
+        # that raised instead of retrying it every tick.
+        chromium_launch_ts = time.monotonic()
+        chromium_restarting = False
 
 def manage_system_state():
     """Checks queue and updates GUI/Chromium without blocking. Acts as a watchdog."""
-    global chromium_process, fail_count
+    global chromium_process, fail_count, chromium_restarting
     try:
         is_connected = wifi_status_queue.get_nowait()
         if wifi_on_img and wifi_off_img:
@@ -211,25 +591,19 @@ def manage_system_state():
             is_process_dead = chromium_process is None or chromium_process.poll() is not None
             is_page_crashed = not check_chromium_page_health()
 
-            if is_process_dead or is_page_crashed:
+            # Cooldown: if Chromium keeps dying instantly (bad URL, broken GPU
+            # state), don't respawn more than once every 30 s.
+            in_cooldown = time.monotonic() - chromium_launch_ts < 30
+
+            if (is_process_dead or is_page_crashed) and not chromium_restarting \
+                    and not in_cooldown:
                 if is_process_dead and chromium_process is not None:
                     log_message("Chromium process not found. Restarting...", "info")
-                
+
                 status_label.config(text="Wi-Fi Connected")
                 show_spinner()
-                subprocess.run(["pkill", "-f", "chromium"], check=False)
-                
-                url = f"https://pixelpaper.com/frame.html?id={get_serial_number()}"
-                
-                chromium_flags = [
-                    "chromium",
-                    "--kiosk",
-                    "--no-sandbox",
-                    "--disable-extensions",
-                    "--autoplay-policy=no-user-gesture-required",
-                    url
-                ]
-                chromium_process = subprocess.Popen(chromium_flags)
+                chromium_restarting = True
+                worker_pool.submit(restart_chromium)
         else:
             hide_spinner()
             fail_count += 1
@@ -297,11 +671,10 @@ def timed_chromium_restart_worker():
 
 # ─────────────────── BLE provisioning handlers ────────────────────────
 def check_wifi_connection():
-    try:
-        s = socket.create_connection(("8.8.8.8", 53), timeout=3)
-        s.close(); return True
-    except OSError:
+    if not has_default_route():
+        # No gateway: don't burn a multi-second connect timeout to find out.
         return False
+    return probe_internet(timeout=3.0)
         
 def handle_wifi_data(payload: str):
     global fail_count
@@ -321,7 +694,7 @@ def handle_wifi_data(payload: str):
         return
 
     log_message(f"Configuring Wi-Fi for '{ssid}'...")
-    show_spinner()
+    _ui(show_spinner)
     
     interface_name = "wlan0"
     
@@ -336,42 +709,92 @@ def handle_wifi_data(payload: str):
             "con-name", ssid, "ifname", interface_name, "ssid", ssid,
             "--", "wifi-sec.key-mgmt", "wpa-psk", "wifi-sec.psk", password
         ]
-        subprocess.run(add_command, check=True, capture_output=True, text=True)
-        
+        # Only keep stderr; buffering stdout in the parent is pointless while
+        # nmcli blocks for the 10-30 s it can take Wi-Fi to associate, and the
+        # timeout stops a stuck nmcli from pinning this worker forever.
+        subprocess.run(add_command, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.PIPE, text=True, timeout=30)
+
         up_command = ["sudo", "nmcli", "connection", "up", ssid]
-        subprocess.run(up_command, check=True, capture_output=True, text=True)
+        subprocess.run(up_command, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.PIPE, text=True, timeout=60)
+        wifi_wake.set()
 
-    except subprocess.CalledProcessError as e:
-        hide_spinner()
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
         log_message("Connection failed. Please check credentials.", "danger")
-        print(f"[nmcli error] STDERR: {e.stderr}")
-        bottom_label.config(text="Authentication failed")
-        status_label.config(text="Waiting for Wi-Fi…")
+        print(f"[nmcli error] STDERR: {getattr(e, 'stderr', None)}")
+        def failed():
+            hide_spinner()
+            bottom_label.config(text="Authentication failed")
+            status_label.config(text="Waiting for Wi-Fi…")
+        _ui(failed)
         fail_count = -999
         return
 
     def verdict():
-        if check_wifi_connection():
-            log_message(f"Successfully connected to '{ssid}'", "success")
-            bottom_label.config(text="")
-        else:
-            hide_spinner()
-            log_message("Failed to get internet. Check network.", "warning")
-            bottom_label.config(text="No internet")
-            status_label.config(text="Waiting for Wi-Fi…")
-            fail_count = -999
-            
-    root.after(8000, verdict)
+        # Runs on the worker pool: the probe can block for seconds.
+        ok = check_wifi_connection()
+        def apply():
+            global fail_count
+            if ok:
+                log_message(f"Successfully connected to '{ssid}'", "success")
+                bottom_label.config(text="")
+            else:
+                hide_spinner()
+                log_message("Failed to get internet. Check network.", "warning")
+                bottom_label.config(text="No internet")
+                status_label.config(text="Waiting for Wi-Fi…")
+                fail_count = -999
+        _ui(apply)
+
+    root.after(8000, lambda: worker_pool.submit(verdict))
+
+# Matches e.g. "  1920x1080 px, 60.000000 Hz (current)" or
+# "... Hz (preferred, current)"; compiled once at import.
+_CURRENT_MODE_RE = re.compile(r"^\s*(\S+)\s+px,?\s+(\S+)\s+Hz.*\([^)]*current[^)]*\)")
+
+def get_current_mode():
+    """Returns the active output mode as 'WIDTHxHEIGHT@HZ'. Prefers
+    wlr-randr's structured --json output; falls back to parsing the plain
+    listing on builds that predate the flag."""
+    try:
+        data = json.loads(
+            subprocess.check_output(["wlr-randr", "--json"], text=True))
+        for out in data:
+            for m in out.get("modes", []):
+                if m.get("current"):
+                    return f"{m['width']}x{m['height']}@{m['refresh']}"
+    except (subprocess.CalledProcessError, ValueError, KeyError):
+        pass
+    out = subprocess.check_output(["wlr-randr"], text=True)
+    for line in out.splitlines():
+        m = _CURRENT_MODE_RE.match(line)
+        if m:
+            return f"{m[1]}@{m[2]}"
+    return None
 
 def handle_orientation_change(arg: str, silent=False):
     output = "HDMI-A-1"
     try:
-        mode = subprocess.check_output("wlr-randr | grep '(current)' | awk '{print $1\"@\"$3}'", shell=True, text=True).strip()
-    except subprocess.CalledProcessError as e:
+        mode = get_current_mode()
+        if not mode:
+            log_message("Detect mode failed: no current mode", "warning"); return
+    except (subprocess.CalledProcessError, OSError) as e:
         log_message(f"Detect mode failed: {e}", "warning"); return
     cfg = f"profile {{\n    output {output} enable mode {mode} position 0,0 transform {arg}\n}}\n"
     p = os.path.expanduser("~/.config/kanshi/config")
     os.makedirs(os.path.dirname(p), exist_ok=True)
+    try:
+        with open(p) as f:
+            existing = f.read()
+    except OSError:
+        existing = ""
+    if existing == cfg:
+        # Already configured this way: skip the SD-card write and the kanshi
+        # restart (which blanks the display for a moment).
+        if not silent:
+            log_message("Orientation unchanged")
+        return
     with open(p, "w") as f: f.write(cfg)
     os.chmod(p, 0o600)
     subprocess.run(["killall", "kanshi"], check=False)
@@ -385,61 +808,144 @@ def handle_clear_wifi():
         chromium_process.kill()
         chromium_process = None
     clear_wifi_profiles()
-    hide_spinner()
-    bottom_label.config(text="")
-    status_label.config(text="Waiting for Wi-Fi…")
     while not wifi_status_queue.empty():
         try:
             wifi_status_queue.get_nowait()
         except queue.Empty:
             break
-    if wifi_off_img:
-        wifi_icon_label.config(image=wifi_off_img)
+    def reset_ui():
+        hide_spinner()
+        bottom_label.config(text="")
+        status_label.config(text="Waiting for Wi-Fi…")
+        if wifi_off_img:
+            wifi_icon_label.config(image=wifi_off_img)
+    _ui(reset_ui)
+
+ble_rx_buf   = bytearray()
+ble_rx_lock  = threading.Lock()
+ble_rx_timer = None
+ble_rx_gen   = 0           # bumped per fragment; stale timers check it
+BLE_RX_FLUSH_DELAY = 0.05  # seconds to wait for the next fragment
 
 def ble_callback(val, _):
-    global auto_brightness_enabled
+    """Accumulates write fragments and dispatches complete commands.
+
+    Central writes arrive in MTU-sized chunks, so a long command (e.g. a
+    WIFI payload) spans several callbacks. Buffer the bytes and flush on a
+    newline terminator or after a short settle delay, instead of paying the
+    full parse for every fragment.
+    """
+    global ble_rx_timer, ble_rx_gen
     if val is None: return
-    msg = (bytes(val) if isinstance(val, list) else val).decode("utf-8", "ignore").strip()
-    
-    print(f"Received BLE command: {msg}")
+    with ble_rx_lock:
+        try:
+            # bytearray.extend takes list[int], bytes and bytearray alike.
+            ble_rx_buf.extend(val)
+        except (TypeError, ValueError):
+            log_message(f"Unexpected BLE value type: {type(val)}", "warning")
+            return
+        # cancel() can't stop a timer whose callback is already blocked on
+        # the lock, so bump the generation too — a stale flush that finally
+        # gets the lock sees the mismatch and leaves the buffer alone.
+        ble_rx_gen += 1
+        if ble_rx_timer is not None:
+            ble_rx_timer.cancel()
+            ble_rx_timer = None
+        if ble_rx_buf.endswith(b'\n'):
+            data, ble_rx_buf[:] = bytes(ble_rx_buf), b''
+        else:
+            ble_rx_timer = threading.Timer(BLE_RX_FLUSH_DELAY, flush_ble_rx,
+                                           args=(ble_rx_gen,))
+            ble_rx_timer.daemon = True
+            ble_rx_timer.start()
+            return
+    for part in data.splitlines():
+        msg = part.decode("utf-8", "ignore").strip()
+        if msg:
+            handle_ble_message(msg)
+
+def flush_ble_rx(expected_gen):
+    """Timer fallback for commands sent without a trailing newline. Flushes
+    only if no fragment arrived since this timer was armed."""
+    global ble_rx_timer
+    with ble_rx_lock:
+        if ble_rx_gen != expected_gen:
+            return
+        ble_rx_timer = None
+        data, ble_rx_buf[:] = bytes(ble_rx_buf), b''
+    for part in data.splitlines():
+        msg = part.decode("utf-8", "ignore").strip()
+        if msg:
+            handle_ble_message(msg)
 
-    if msg.startswith("WIFI:"):
-        handle_wifi_data(msg[5:])
-    elif msg.startswith("ORIENT:"):
-        orientation_val = msg[7:]
-        handle_orientation_change(orientation_val)
-        save_settings({'orientation': orientation_val})
+def _ble_wifi(payload):
+    # nmcli work can block for seconds; run it on the shared pool so the
+    # BLE callback thread returns immediately.
+    worker_pool.submit(handle_wifi_data, payload)
 
-    elif msg.startswith("BRIGHT:"):
-        auto_brightness_enabled = False
-        try:
-            b = int(msg[7:])
-            set_manual_brightness(b)
-            save_settings({'brightness': b, 'autoBrightness': False})
-        except ValueError:
-            log_message(f"Invalid brightness value: {msg[7:]}", "warning")
-
-    elif msg.startswith("AUTOBRIGHT:"):
-        v = msg[11:]
-        if v.startswith("ON"):
-            auto_brightness_enabled = True
+def _ble_orient(payload):
+    worker_pool.submit(handle_orientation_change, payload)
+    save_settings({'orientation': payload})
+
+def _ble_bright(payload):
+    # A DDC/CI transaction can take hundreds of ms; parse inline, but run
+    # the ddcutil work on the pool like the other subprocess handlers.
+    global auto_brightness_enabled
+    auto_brightness_enabled = False
+    try:
+        b = int(payload)
+    except ValueError:
+        log_message(f"Invalid brightness value: {payload}", "warning")
+        return
+    def apply():
+        set_manual_brightness(b)
+        save_settings({'brightness': b, 'autoBrightness': False})
+    worker_pool.submit(apply)
+
+def _ble_autobright(payload):
+    global auto_brightness_enabled
+    if payload.startswith("ON"):
+        auto_brightness_enabled = True
+        def apply_on():
             set_brightness_for_time()
             log_message("Auto-brightness enabled")
             save_settings({'autoBrightness': True})
-        elif v.startswith("OFF"):
-            auto_brightness_enabled = False
-            try:
-                snap = int(v.split(':',1)[1])
-                set_manual_brightness(snap, silent=True)
-                log_message(f"Auto-brightness OFF. Set to {snap}%")
-                save_settings({'brightness': snap, 'autoBrightness': False})
-            except Exception:
-                log_message("Auto-brightness disabled")
+        worker_pool.submit(apply_on)
+    elif payload.startswith("OFF"):
+        auto_brightness_enabled = False
+        try:
+            snap = int(payload.split(':', 1)[1])
+        except (IndexError, ValueError):
+            log_message("Auto-brightness disabled")
+            return
+        def apply_off():
+            set_manual_brightness(snap, silent=True)
+            log_message(f"Auto-brightness OFF. Set to {snap}%")
+            save_settings({'brightness': snap, 'autoBrightness': False})
+        worker_pool.submit(apply_off)
+
+def _ble_clear_wifi(_payload):
+    worker_pool.submit(handle_clear_wifi)
+
+def _ble_reboot(_payload):
+    subprocess.run(["sudo", "reboot"], check=False)
+
+# One prefix -> handler lookup instead of a startswith/slice chain per message.
+_BLE_HANDLERS = {
+    "WIFI":       _ble_wifi,
+    "ORIENT":     _ble_orient,
+    "BRIGHT":     _ble_bright,
+    "AUTOBRIGHT": _ble_autobright,
+    "CLEAR_WIFI": _ble_clear_wifi,
+    "REBOOT":     _ble_reboot,
+}
 
-    elif msg == "CLEAR_WIFI":
-        handle_clear_wifi()
-    elif msg == "REBOOT":
-        subprocess.run(["sudo", "reboot"], check=False)
+def handle_ble_message(msg: str):
+    print(f"Received BLE command: {msg}")
+    prefix, _, payload = msg.partition(":")
+    handler = _BLE_HANDLERS.get(prefix)
+    if handler:
+        handler(payload)
     else:
         log_message(f"Unknown BLE cmd: {msg}", "warning")
 
@@ -453,17 +959,35 @@ def get_initial_settings_payload():
     settings = load_settings()
     return list(json.dumps(settings).encode())
 
+def tune_ble_connection():
+    """Requests a tighter connection interval so provisioning writes are not
+    stuck at the BlueZ defaults. Best effort: the debugfs knobs need root and
+    may not exist on every kernel."""
+    params = {'conn_min_interval': '6', 'conn_max_interval': '12', 'conn_latency': '0'}
+    for name, value in params.items():
+        try:
+            with open(f'/sys/kernel/debug/bluetooth/hci0/{name}', 'w') as f:
+                f.write(value)
+        except OSError:
+            pass
+
 def start_gatt():
-    """Initializes and runs the BLE GATT server in a persistent loop."""
+    """Initializes and runs the BLE GATT server in a persistent loop.
+    Restart delays back off exponentially (capped at 60 s) with a little
+    jitter, so a dead adapter doesn't spin the loop and repeated failures
+    don't land in lockstep with other periodic work; the delay resets once
+    a publish has actually served for a while."""
+    delay = 5
     while True:
+        publish_started = None
         try:
-            dongles = adapter.Adapter.available()
-            if not dongles:
+            addr = get_adapter_address()
+            if not addr:
                 log_message("No BLE adapter found!", "danger")
-                time.sleep(5)
+                time.sleep(delay * (1 + random.uniform(0, 0.5)))
+                delay = min(delay * 2, 60)
                 continue
-            
-            addr = list(dongles)[0].address
+
             ble = peripheral.Peripheral(addr, local_name="PixelPaper")
             
             ble.add_service(1, PROVISIONING_SERVICE_UUID, primary=True)
@@ -471,18 +995,28 @@ def start_gatt():
             ble.add_characteristic(1, 1, PROVISIONING_CHAR_UUID,
                                    [], False, ['write','write-without-response'],
                                    write_callback=ble_callback)
+            serial_bytes = list(get_serial_number().encode())
             ble.add_characteristic(1, 2, SERIAL_CHAR_UUID,
-                                   list(get_serial_number().encode()), False, ['read'],
-                                   read_callback=lambda _o: list(get_serial_number().encode()))
+                                   serial_bytes, False, ['read'],
+                                   read_callback=lambda _o, _v=serial_bytes: _v)
             # Initialize settings char with current data and support reads
             ble.add_characteristic(1, 3, SETTINGS_CHAR_UUID,
                                    value=get_initial_settings_payload(), notifying=False,
                                    flags=['read'], read_callback=settings_read_callback)
 
+            tune_ble_connection()
+            publish_started = time.monotonic()
             ble.publish()
         except Exception as e:
             log_message(f"GATT error: {e}", "danger")
-            time.sleep(5)
+            # Only count the server as recovered when publish() actually ran
+            # for a while; resetting before the call let a fast
+            # register-advertisement failure defeat the backoff forever.
+            if publish_started is not None and \
+                    time.monotonic() - publish_started >= 30:
+                delay = 5
+            time.sleep(delay * (1 + random.uniform(0, 0.5)))
+            delay = min(delay * 2, 60)
 
 # ─────────────────────────── Build GUI ────────────────────────────────
 root = tb.Window(themename="darkly")
@@ -495,9 +1029,16 @@ def _show_then_hide(_):
 
 root.bind("<Motion>", _show_then_hide)
 root.style.colors.set('info', GREEN)
+
+# Named fonts created once so Tk never re-resolves a font tuple on configure
+# and repeated label updates hit its glyph cache.
+STATUS_FONT    = tkfont.Font(family="Helvetica", size=48, weight="bold")
+SECONDARY_FONT = tkfont.Font(family="Helvetica", size=24)
+TOAST_FONT     = tkfont.Font(family="Helvetica", size=14)
+
 root.style.configure("TFrame", background="black")
-root.style.configure("Status.TLabel", background="black", foreground=GREEN, font=("Helvetica", 48, "bold"))
-root.style.configure("Secondary.TLabel", background="black", foreground=GREEN2, font=("Helvetica", 24))
+root.style.configure("Status.TLabel", background="black", foreground=GREEN, font=STATUS_FONT)
+root.style.configure("Secondary.TLabel", background="black", foreground=GREEN2, font=SECONDARY_FONT)
 root.configure(bg="black")
 root.title("Frame Status")
 root.attributes("-fullscreen", True)
@@ -538,6 +1079,7 @@ disable_pairing()
 apply_startup_settings()  # NEW: load/apply settings on startup
 threading.Thread(target=start_gatt, daemon=True).start()
 threading.Thread(target=wifi_check_worker, daemon=True).start()
+threading.Thread(target=nm_monitor_worker, daemon=True).start()
 threading.Thread(target=auto_brightness_worker, daemon=True).start()
 threading.Thread(target=timed_chromium_restart_worker, daemon=True).start()
 root.after(100, show_toast_from_queue)
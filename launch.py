@@ -10,12 +10,15 @@ import hashlib, os, shutil, subprocess, sys, tarfile, tempfile, urllib.request
 
 # ── CONFIG ────────────────────────────────────────────────────────────
 TARBALL_URL = "https://github.com/pxpaper/frame/archive/refs/heads/main.tar.gz"
+REPO_URL     = "https://github.com/pxpaper/frame.git"
+REPO_BRANCH  = "main"
 NETWORK_WAIT = 90         # seconds nm-online may wait
 DOWNLOAD_TO  = "/tmp/pixelpaper_update/frame.tar.gz"
 SCRIPT_DIR   = os.path.dirname(os.path.abspath(__file__))
 VENV_DIR     = os.path.join(SCRIPT_DIR, "venv")
 VENV_PY      = os.path.join(VENV_DIR, "bin", "python3")
 GUI_SCRIPT   = os.path.join(SCRIPT_DIR, "gui.py")
+SHA_FILE     = os.path.join(SCRIPT_DIR, ".last_update_sha")
 
 # ────────────────────────────────────────────────────────────────────────
 def network_available(timeout=NETWORK_WAIT) -> bool:
@@ -50,14 +53,39 @@ def overlay_tarball(tar_path, dest_dir=SCRIPT_DIR):
         src = os.path.join(tdir, root)
         subprocess.run(
             ["rsync", "-a", "--delete", "--exclude", "venv/",
+             "--exclude", os.path.basename(SHA_FILE),
              f"{src}/", f"{dest_dir}/"], check=True)
         print("[update] overlay complete")
 
+def remote_head_sha(url=REPO_URL, branch=REPO_BRANCH):
+    """Returns the SHA of the remote branch head, or None if unreachable."""
+    try:
+        out = subprocess.check_output(
+            ["git", "ls-remote", url, f"refs/heads/{branch}"],
+            text=True, timeout=30, stderr=subprocess.DEVNULL)
+        return out.split()[0] if out.strip() else None
+    except Exception:
+        return None
+
 def update_repo():
     """Public helper to download and overlay the repo."""
     try:
+        # Skip the whole download/overlay when we already match the remote
+        # HEAD — the common case on a normal reboot.
+        sha = remote_head_sha()
+        if sha:
+            try:
+                with open(SHA_FILE) as f:
+                    if f.read().strip() == sha:
+                        print("[update] already at remote HEAD, skipping")
+                        return
+            except OSError:
+                pass
         tarball_path = download_tarball()
         overlay_tarball(tarball_path)
+        if sha:
+            with open(SHA_FILE, "w") as f:
+                f.write(sha)
     except Exception as err:
         print(f"[update_repo] failed: {err}")
 